@@ -9,10 +9,16 @@ import re
 PORT = 'COM4'   # IMPORTANTE: AJUSTA ESTO al puerto correcto donde esté conectado el TVK6
 BAUDRATE = 4800
 TIMEOUT = 2
+# Ventana (ms) en la que se agrupan los datos recibidos antes de redibujar la pantalla
+DISPLAY_INTERVAL_MS = 50
 
 # --- Expresiones Regulares ---
 # Regex mejorada para limpiar todos los códigos de escape ANSI/VT100,
 # incluyendo secuencias CSI (ESC [...) y otras como (ESC # ...), y códigos de un solo carácter.
 # Esta regex simple y agresiva elimina cualquier secuencia que comience con ESC (\x1b)
 # y los caracteres de control SO/SI. Esto es más robusto para la salida del TVK6.
-ANSI_ESCAPE = re.compile(r'(\x1b\[[0-9;?]*[A-Za-z])|(\x1b[#()][A-Z0-9])|[\x0e\x0f]')
\ No newline at end of file
+ANSI_ESCAPE = re.compile(r'(\x1b\[[0-9;?]*[A-Za-z])|(\x1b[#()][A-Z0-9])|[\x0e\x0f]')
+
+# Secuencia CSI completa (ESC [ parámetros comando) usada por el ScreenEmulator.
+# Se compila una sola vez aquí en lugar de en cada instancia del emulador.
+ANSI_CSI = re.compile(r'\x1b\[([0-9;?]*)([A-Za-z])')
@@ -4,19 +4,55 @@ Módulo de la ventana principal de la aplicación.
 Contiene la clase MainWindow, que gestiona la interfaz de usuario,
 las interacciones y la orquestación del SerialWorker.
 """
-import re
-
 from PySide6.QtWidgets import QMainWindow, QLineEdit, QPlainTextEdit, QLabel, QPushButton
 from PySide6.QtUiTools import QUiLoader
-from PySide6.QtCore import Signal, Slot, QThread, Qt
+from PySide6.QtCore import Signal, Slot, QThread, QTimer, Qt
 from PySide6.QtGui import QKeySequence
 
 # Importaciones de nuestros módulos
 from serial_worker import SerialWorker
-from config import ANSI_ESCAPE, PORT, BAUDRATE
+from config import ANSI_ESCAPE, ANSI_CSI, PORT, BAUDRATE, DISPLAY_INTERVAL_MS
 from ui_panels import MeasurementPanel
 from menu_manager import MenuManager
-from state_manager import StateManager
+from state_manager import StateManager, DATA_ENTRY_STATES
+
+# Caracteres de control que el emulador descarta sin mover el cursor (SO, SI y CR).
+IGNORED_CONTROL_CHARS = frozenset('\x0e\x0f\r')
+# Tabla para eliminar esos mismos caracteres de un bloque de texto con str.translate.
+IGNORED_CONTROL_TABLE = str.maketrans('', '', '\x0e\x0f\r')
+
+# Comandos de texto que, como los dígitos, navegan entre menús.
+NAVIGATION_COMMANDS = frozenset({'reset', 'esc'})
+
+# Claves de los valores de medición que se muestran en el panel ("X = 1.0", "U1 = 120.0").
+MEASUREMENT_KEYS = ('X', 'K', 'U1')
+
+def find_measurement(text, key):
+    """
+    Devuelve el número de la primera aparición de "<key> = <número>" en el texto, o None.
+
+    Equivale a re.search(key + r'\s*=\s*([0-9.]+)') pero solo con str.find y
+    comparaciones de caracteres, sin pasar por el motor de regex.
+    """
+    length = len(text)
+    start = 0
+    while True:
+        i = text.find(key, start)
+        if i < 0:
+            return None
+        j = i + len(key)
+        while j < length and text[j].isspace():
+            j += 1
+        if j < length and text[j] == '=':
+            j += 1
+            while j < length and text[j].isspace():
+                j += 1
+            end = j
+            while end < length and text[end] in '0123456789.':
+                end += 1
+            if end > j:
+                return text[j:end]
+        start = i + 1
 
 class ScreenEmulator:
     """Emulador simple de terminal VT100 para reconstruir la pantalla del TVK6."""
@@ -25,7 +61,6 @@ class ScreenEmulator:
         self.cols = cols
         self.screen = [[' ' for _ in range(cols)] for _ in range(rows)]
         self.cursor_pos = [0, 0]
-        self.ansi_pattern = re.compile(r'\x1b\[([0-9;?]*)([A-Za-z])')
         # --- INICIO DE LA MODIFICACIÓN: Buffer para datos incompletos ---
         self.incomplete_data_buffer = ""
         # --- FIN DE LA MODIFICACIÓN ---
@@ -41,6 +76,19 @@ class ScreenEmulator:
         # --- INICIO DE LA MODIFICACIÓN: Unir buffer con nuevos datos ---
         data = self.incomplete_data_buffer + data
         self.incomplete_data_buffer = "" # Limpiamos el buffer una vez usado
+
+        # Camino rápido: texto plano sin secuencias de escape ni saltos de línea
+        # (el caso habitual cuando el TVK6 refresca una lectura). Se escribe de
+        # una vez en la fila actual en lugar de carácter por carácter.
+        if '\x1b' not in data and '\n' not in data:
+            text = data.translate(IGNORED_CONTROL_TABLE)
+            row, col = self.cursor_pos
+            if row < self.rows and col < self.cols:
+                text = text[:self.cols - col]
+                self.screen[row][col:col + len(text)] = text
+                self.cursor_pos[1] += len(text)
+            return
+
         # Procesamos el flujo de datos carácter por carácter para un manejo robusto de ANSI.
         i = 0
         while i < len(data):
@@ -54,11 +102,16 @@ class ScreenEmulator:
                     break
 
                 if data[i] == '[': # Secuencia CSI (Control Sequence Introducer)
-                    i += 1 # Consumimos '['
-                    params_str = ""
-                    while i < len(data) and data[i] in '0123456789;?':
-                        params_str += data[i]
-                        i += 1
+                    csi_match = ANSI_CSI.match(data, i - 1)
+                    if csi_match: # Caso habitual: secuencia completa, sin recorrer los parámetros uno a uno
+                        params_str = csi_match.group(1)
+                        i = csi_match.start(2)
+                    else:
+                        i += 1 # Consumimos '['
+                        params_str = ""
+                        while i < len(data) and data[i] in '0123456789;?':
+                            params_str += data[i]
+                            i += 1
                     
                     if i >= len(data): # Secuencia CSI incompleta
                         self.incomplete_data_buffer = "\x1b[" + params_str
@@ -100,7 +153,7 @@ class ScreenEmulator:
                 # Ignoramos caracteres de control no imprimibles como SO/SI (0x0e, 0x0f)
                 if char == '\n':
                     self.cursor_pos[0] += 1 # Mover a la siguiente línea
-                elif char not in '\x0e\x0f\r':
+                elif char not in IGNORED_CONTROL_CHARS:
                     row, col = self.cursor_pos
                     if row < self.rows and col < self.cols:
                         self.screen[row][col] = char
@@ -119,6 +172,15 @@ class MainWindow(QMainWindow):
         super().__init__()
 
         self.parsed_values = {'X': '---', 'K': '---', 'U1': '---'}
+        self._last_screen_text = None # Última pantalla mostrada en el monitor
+
+        # El ReaderThread entrega los datos casi byte a byte. Los acumulamos y
+        # redibujamos como máximo una vez cada DISPLAY_INTERVAL_MS.
+        self._pending_data = []
+        self._display_timer = QTimer(self)
+        self._display_timer.setSingleShot(True)
+        self._display_timer.setInterval(DISPLAY_INTERVAL_MS)
+        self._display_timer.timeout.connect(self._process_pending_data)
 
         loader = QUiLoader()
         self.ui = loader.load(ui_file, self)
@@ -208,6 +270,10 @@ class MainWindow(QMainWindow):
         """Limpia el QPlainTextEdit de la consola."""
         if self.monitorSalida:
             self.monitorSalida.clear()
+            self._last_screen_text = None # La próxima pantalla debe volver a dibujarse
+            # Los datos aún no procesados pertenecen a la pantalla que estamos borrando
+            self._pending_data.clear()
+            self._display_timer.stop()
             # --- INICIO DE LA MODIFICACIÓN ---
             # También reiniciamos el historial del gestor de menú.
             # Y reseteamos el emulador de pantalla para una transición limpia.
@@ -248,10 +314,10 @@ class MainWindow(QMainWindow):
         self.state_manager.process_command(command)
 
         # Limpiamos la consola en comandos de navegación para una UI más limpia
-        is_navigation_command = command.isdigit() or command.lower() in ['reset', 'esc']
+        is_navigation_command = command.isdigit() or command.lower() in NAVIGATION_COMMANDS
         current_state = self.state_manager.get_current_state_name()
         
-        if is_navigation_command and current_state not in ['DATOS_MEDIDOR_MENU', 'CALIBRAR_DATA_ENTRY']:
+        if is_navigation_command and current_state not in DATA_ENTRY_STATES:
             self.clear_monitor()
 
         if not self.thread or not self.thread.isRunning() or not self.worker.serial_port or not self.worker.serial_port.is_open:
@@ -274,40 +340,56 @@ class MainWindow(QMainWindow):
 
     @Slot(str)
     def display_data(self, raw_data):
-        """Muestra la data RAW y realiza el parsing de datos Medidos."""
+        """Acumula la data RAW recibida y programa su procesamiento."""
+        self._pending_data.append(raw_data)
+        if not self._display_timer.isActive():
+            self._display_timer.start()
+
+    @Slot()
+    def _process_pending_data(self):
+        """Muestra la data RAW acumulada y realiza el parsing de datos Medidos."""
+        raw_data = "".join(self._pending_data)
+        self._pending_data.clear()
+        if not raw_data:
+            return
+
         # No mostramos el raw_data directamente para evitar basura visual.
         # En su lugar, lo procesamos con el emulador de pantalla.
         self.screen_emulator.process_data(raw_data)
         screen_text = self.screen_emulator.get_screen_text() # Obtener el texto reconstruido de la pantalla
+
+        # Si la pantalla es idéntica a la última mostrada, el monitor y los valores
+        # medidos ya están al día. Solo el StateManager la recibe, porque su análisis
+        # depende también del estado actual (y tiene su propia caché).
+        if screen_text == self._last_screen_text:
+            self.state_manager.process_screen_text(screen_text)
+            return
+        self._last_screen_text = screen_text
         
         self.monitorSalida.setPlainText(screen_text) # Mostrar el texto emulado en la consola
         
         # Ahora usamos el texto reconstruido de la pantalla para el parsing
         # --- INICIO DE LA MODIFICACIÓN: Parsing robusto ---
-        # Regex para buscar explícitamente los valores usando grupos de captura.
-        # El lookbehind (?<=...) no funciona con patrones de longitud variable como \s*.
-        # En su lugar, capturamos el número con () y lo extraemos con .group(1).
-        x_match = re.search(r'X\s*=\s*([0-9.]+)', screen_text)
-        k_match = re.search(r'K\s*=\s*([0-9.]+)', screen_text)
-        u1_match = re.search(r'U1\s*=\s*([0-9.]+)', screen_text)
-
-        # Solo actualizamos si encontramos los patrones. Si no, mantenemos los valores antiguos.
+        # Si no hay ningún '=' en pantalla no puede haber valores: nos ahorramos la búsqueda.
+        found_values = {}
+        if '=' in screen_text:
+            for key in MEASUREMENT_KEYS:
+                value = find_measurement(screen_text, key)
+                if value is not None:
+                    found_values[key] = value
+
+        # Solo actualizamos las claves encontradas. Si no, mantenemos los valores antiguos.
         # Esto es clave para cuando el TVK6 solo envía una actualización parcial de la pantalla.
-        if x_match:
-            self.parsed_values['X'] = x_match.group(1)
-        # Si no hay 'X =', no borramos el valor anterior.
-
-        if k_match:
-            self.parsed_values['K'] = k_match.group(1)
-        # Si no hay 'K =', no borramos el valor anterior.
-
-        if u1_match:
-            self.parsed_values['U1'] = u1_match.group(1)
-        # Si no hay 'U1 =', no borramos el valor anterior.
+        values_changed = False
+        for key, value in found_values.items():
+            if self.parsed_values[key] != value:
+                self.parsed_values[key] = value
+                values_changed = True
         # --- FIN DE LA MODIFICACIÓN ---
         
-        # Delegamos la actualización visual al panel correspondiente
-        self.measurement_panel.update_display(self.parsed_values)
+        # Delegamos la actualización visual al panel correspondiente, solo si algún valor cambió
+        if values_changed:
+            self.measurement_panel.update_display(self.parsed_values)
         
         # Delegamos la actualización del menú dinámico
         self.state_manager.process_screen_text(screen_text)
@@ -327,7 +409,7 @@ class MainWindow(QMainWindow):
             self.send_command(command)
         # --- INICIO DE LA MODIFICACIÓN: Navegación por campos ---
         # Si estamos en modo de entrada de datos de calibración, las flechas y Enter tienen funciones especiales.
-        elif self.state_manager.get_current_state_name() in ['CALIBRAR_DATA_ENTRY', 'DATOS_MEDIDOR_MENU']:
+        elif self.state_manager.get_current_state_name() in DATA_ENTRY_STATES:
             if key in [Qt.Key.Key_Return, Qt.Key.Key_Enter, Qt.Key.Key_Right]:
                 # Enter o Flecha Derecha envían un retorno de carro para pasar al siguiente campo.
                 self.send_command('enter')
@@ -5,10 +5,10 @@ Parsea la salida del TVK6 para encontrar opciones de menú y crea
 botones dinámicamente en la interfaz.
 """
 import re
-from functools import partial
+from PySide6.QtCore import QObject, Slot
 from PySide6.QtWidgets import QPushButton, QSizePolicy, QGroupBox
 
-class MenuManager:
+class MenuManager(QObject):
     """Gestiona la creación y actualización del panel de menú dinámico."""
 
     def __init__(self, parent_ui, main_window):
@@ -17,6 +17,7 @@ class MenuManager:
         :param parent_ui: Referencia a la UI cargada (self.ui).
         :param main_window: Referencia a la instancia de MainWindow para enviar comandos.
         """
+        super().__init__(main_window)
         self.main_window = main_window
         self.dynamic_menu_group_box = parent_ui.findChild(QGroupBox, 'groupBoxMenuDinamico')
         self.dynamic_menu_layout = self.dynamic_menu_group_box.layout()
@@ -36,18 +37,29 @@ class MenuManager:
             button.deleteLater()
         self.buttons = []
 
-    def create_button(self, number, text):
-        """Crea y estiliza un nuevo botón para el menú."""
-        button = QPushButton(f"{number}. {text.strip()}")
+    def create_button(self, number, label):
+        """
+        Crea y estiliza un nuevo botón para el menú.
+        :param number: Comando numérico que envía el botón.
+        :param label: Texto ya formateado que se muestra en el botón.
+        """
+        button = QPushButton(label)
         button.setMinimumHeight(35)
         button.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
         
-        # Conectar el clic del botón para enviar el comando numérico
-        # Usamos partial para "congelar" el valor de 'number' en el momento de la creación
-        button.clicked.connect(partial(self.main_window.send_command, number))
+        # Guardamos el número del comando en el propio botón y conectamos todos
+        # los botones a un único slot, en lugar de crear un partial por botón.
+        button.setProperty('menuNumber', number)
+        button.clicked.connect(self._on_menu_button)
         
         return button
 
+    @Slot()
+    def _on_menu_button(self):
+        """Envía el comando numérico asociado al botón de menú pulsado."""
+        button = self.sender()
+        self.main_window.send_command(button.property('menuNumber'))
+
     def update_menu_config(self, config):
         """Recibe una nueva configuración de menú desde el StateManager."""
         self.current_config = config
@@ -71,12 +83,19 @@ class MenuManager:
         
         menu_matches = tuple(self.current_config['regex_compiled'].findall(search_text))
 
-        if menu_matches and menu_matches != self.current_menu_options:
+        if not menu_matches:
+            # La pantalla corresponde al estado pero no muestra opciones: no dejamos
+            # los botones de una página anterior, que enviarían dígitos no válidos.
+            if self.buttons:
+                self.reset()
+            return
+
+        if menu_matches != self.current_menu_options:
             self.current_menu_options = menu_matches
             self.clear_menu()
             
             for number, text in menu_matches:
-                clean_text = text.strip()
-                button = self.create_button(number, clean_text)
+                # Formateamos la etiqueta una sola vez por opción
+                button = self.create_button(number, f"{number}. {text.strip()}")
                 self.dynamic_menu_layout.addWidget(button)
                 self.buttons.append(button)
\ No newline at end of file
@@ -5,13 +5,39 @@ Contiene la clase SerialWorker que maneja la comunicación serial en un hilo
 separado para no bloquear la interfaz de usuario.
 """
 import serial
+import threading
 import time
+from functools import partial
+from serial.threaded import Protocol, ReaderThread
 
-from PySide6.QtCore import QObject, Signal, Slot, QCoreApplication
+from PySide6.QtCore import QObject, Signal, Slot
 
 # Importamos la configuración
 from config import BAUDRATE, TIMEOUT
 
+class _TvkProtocol(Protocol):
+    """Protocolo de pyserial que reenvía al SerialWorker los datos leídos por el ReaderThread."""
+
+    def __init__(self, worker):
+        self.worker = worker
+
+    def data_received(self, data):
+        text = data.decode('latin-1') # Usar latin-1 para preservar todos los bytes
+        if text:
+            self.worker.data_received.emit(text)
+
+    def connection_lost(self, exc):
+        if exc is not None:
+            self.worker.error.emit(f"Error en comunicación serial: {exc}")
+            self.worker.connection_status.emit(False, "ERROR: Conexión perdida.")
+        # El lector ya terminó: lo soltamos para que stop() no intente detenerlo de
+        # nuevo sobre un puerto cerrado (cancel_read falla en Windows tras close()).
+        # stop() libera el lock antes de esperar al lector, así que no hay bloqueo.
+        with self.worker._lock:
+            self.worker.running = False
+            self.worker.reader = None
+        self.worker.close_port()
+
 class SerialWorker(QObject):
     """Maneja la comunicación serial en un hilo separado para evitar que la UI se congele."""
     data_received = Signal(str)
@@ -23,11 +49,14 @@ class SerialWorker(QObject):
         super().__init__()
         self.running = False
         self.serial_port = None
+        self.reader = None
         self.port = port
+        # Protege running/reader entre run() (hilo del worker) y stop() (hilo de la UI)
+        self._lock = threading.Lock()
 
     @Slot()
     def run(self):
-        """Intenta conectar y entra en el bucle de lectura serial."""
+        """Intenta conectar y arranca el ReaderThread que recibe los datos del puerto."""
         self.running = True
         try:
             # Configuración del puerto serial según el protocolo del TVK6 (7S2)
@@ -56,25 +85,19 @@ class SerialWorker(QObject):
             self.running = False
             return
 
-        while self.running:
-            try:
-                data = self.serial_port.read_all()
-               
-                if data:
-                    print(data)
-                    text = data.decode('latin-1') # Usar latin-1 para preservar todos los bytes
-                    print(text)
-                    if text:
-                        self.data_received.emit(text)
-            except Exception as e:
-                self.error.emit(f"Error en comunicación serial: {e}")
-                self.connection_status.emit(False, "ERROR: Conexión perdida.")
-                self.running = False
-                break
-
-            time.sleep(0.05)
-            QCoreApplication.processEvents()
+        # La lectura la hace el ReaderThread de pyserial con lecturas bloqueantes,
+        # sin sondeo ni pausas. Este hilo queda libre para atender write_command.
+        with self._lock:
+            # Si se llamó a stop() mientras abríamos el puerto (ej. Reconectar durante
+            # la pausa inicial), no arrancamos el lector y cerramos el puerto aquí.
+            if not self.running:
+                self.close_port()
+                return
+            self.reader = ReaderThread(self.serial_port, partial(_TvkProtocol, self))
+            self.reader.start()
 
+    def close_port(self):
+        """Cierra el puerto serial si sigue abierto y notifica la desconexión."""
         try:
             if self.serial_port and self.serial_port.is_open:
                 self.serial_port.close()
@@ -112,5 +135,11 @@ class SerialWorker(QObject):
 
     @Slot()
     def stop(self):
-        """Marca el worker para detener la ejecución y salir del bucle."""
-        self.running = False
\ No newline at end of file
+        """Detiene el ReaderThread, que a su vez cierra el puerto serial."""
+        with self._lock:
+            self.running = False
+            reader = self.reader
+            self.reader = None
+        # Esperamos al lector fuera del lock: su connection_lost cierra el puerto
+        if reader:
+            reader.stop()
\ No newline at end of file
@@ -5,7 +5,20 @@ Gestiona el estado actual de la aplicación, las transiciones entre estados
 y la configuración de los menús.
 """
 import json
+import logging
 import re
+import sys
+
+_log = logging.getLogger(__name__)
+
+# Estados desde los que 'esc'/'reset' vuelven al menú principal en lugar de a INIT.
+RETURN_TO_MAIN_MENU_STATES = frozenset({
+    'DATOS_MEDIDOR_MENU', 'ENTRADAS_MENU', 'CALIBRAR_DATA_ENTRY', 'CALIBRAR_MENU',
+})
+
+# Estados de edición de campos en el TVK6: no se limpia el monitor al navegar
+# y las flechas/Enter/Borrar se traducen a teclas del equipo.
+DATA_ENTRY_STATES = frozenset({'DATOS_MEDIDOR_MENU', 'CALIBRAR_DATA_ENTRY'})
 
 class StateManager:
     """Gestiona la máquina de estados de la aplicación."""
@@ -13,7 +26,11 @@ class StateManager:
     def __init__(self, menu_manager, config_file='menu_config.json'):
         self.menu_manager = menu_manager
         self.current_state = 'INIT'
+        self._last_screen_text = None # Última pantalla analizada en el estado actual
         self._load_config(config_file)
+        # Configuración y transiciones del estado actual, actualizadas solo en set_state
+        self._current_config = self._states.get(self.current_state) or {}
+        self._current_transitions = self._current_config.get('transitions', {})
         self.menu_manager.update_menu_config(None) # Iniciar sin menú
 
     def _load_config(self, config_file):
@@ -21,59 +38,109 @@ class StateManager:
         try:
             with open(config_file, 'r', encoding='utf-8') as f:
                 self.config = json.load(f)
-                # Precompilar todas las regex para eficiencia
+                # Internamos los nombres de estado (claves y destinos) para que las
+                # comparaciones con current_state sean por identidad
+                self.config['states'] = {
+                    sys.intern(state_name): state_data
+                    for state_name, state_data in self.config['states'].items()
+                }
                 for state_data in self.config['states'].values():
+                    # Precompilar todas las regex para eficiencia
                     if 'regex' in state_data:
                         state_data['regex_compiled'] = re.compile(state_data['regex'], re.UNICODE)
+                    if 'transition_to' in state_data:
+                        state_data['transition_to'] = sys.intern(state_data['transition_to'])
+                    transitions = state_data.get('transitions', {})
+                    for command, target in transitions.items():
+                        transitions[command] = sys.intern(target)
         except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"Error cargando la configuración de estados: {e}")
+            _log.error("Error cargando la configuración de estados: %s", e)
             self.config = {'states': {}}
 
+        # Referencia directa a los estados para no repetir self.config['states']
+        self._states = self.config['states']
+
+        # Palabras clave de detección de cada estado, precalculadas como tuplas para
+        # no consultar la configuración en cada pantalla. Solo estados que las definen.
+        # Se ordenan de la más larga (más específica) a la más corta para que all()
+        # descarte antes las pantallas que no corresponden al estado.
+        self._detection_keywords = {
+            state_name: tuple(sorted(state_data['detection_keywords'], key=len, reverse=True))
+            for state_name, state_data in self._states.items()
+            if state_data.get('detection_keywords')
+        }
+
     def get_current_state_name(self):
         return self.current_state
 
     def process_screen_text(self, screen_text):
         """Analiza el texto de la pantalla para detectar cambios de estado automáticos."""
-        if self.current_state == 'INIT':
-            init_config = self.config['states'].get('INIT', {})
-            keywords = init_config.get('detection_keywords', [])
-            if all(keyword in screen_text for keyword in keywords):
-                self.set_state(init_config.get('transition_to', 'MAIN_MENU'))
-                return
-
-        # Detección para otros menús que pueden aparecer sin un comando explícito
-        state_config = self.config['states'].get(self.current_state, {})
-        keywords = state_config.get('detection_keywords', [])
-        if keywords and all(keyword in screen_text for keyword in keywords):
-            # El menú coincide con el estado actual, pasamos la config al MenuManager
+        # Estados sin palabras clave (ej. CALIBRAR_DATA_ENTRY, MAIN_MENU) no detectan
+        # nada: salimos antes de comparar o guardar la pantalla.
+        keywords = self._detection_keywords.get(self.current_state)
+        if not keywords:
+            return
+
+        # Si la pantalla no cambió desde el último análisis en este estado, el
+        # resultado sería el mismo: no repetimos la detección ni redibujamos el menú.
+        if screen_text == self._last_screen_text:
+            return
+        self._last_screen_text = screen_text
+
+        # Una única comprobación de las palabras clave del estado actual por pantalla.
+        if not all(keyword in screen_text for keyword in keywords):
+            return
+
+        state_config = self._current_config
+
+        if 'transition_to' in state_config:
+            # Estados como INIT pasan automáticamente a otro estado al ser detectados
+            self.set_state(state_config['transition_to'])
+            return
+
+        # El menú coincide con el estado actual, pasamos la config al MenuManager.
+        # Si ya la tiene (p. ej. tras set_state) no la reinstalamos, porque eso borra
+        # los botones y obliga a redibujar el menú aunque las opciones no cambien.
+        if state_config is not self.menu_manager.current_config:
             self.menu_manager.update_menu_config(state_config)
-            self.menu_manager.parse_and_draw(screen_text)
+        self.menu_manager.parse_and_draw(screen_text)
 
     def process_command(self, command):
         """Procesa un comando del usuario y realiza la transición de estado si corresponde."""
         command = command.lower()
         
-        # Lógica de retorno genérica
-        if command in ['esc', 'reset']:
-            # Reglas de retorno específicas
-            if self.current_state in ['DATOS_MEDIDOR_MENU', 'ENTRADAS_MENU']:
-                self.set_state('MAIN_MENU')
-            elif self.current_state in ['CALIBRAR_DATA_ENTRY', 'CALIBRAR_MENU']:
-                 self.set_state('MAIN_MENU')
-            else:
-                self.set_state('INIT')
+        # Comandos con lógica propia (esc, reset): una consulta al diccionario
+        handler = self._COMMAND_HANDLERS.get(command)
+        if handler:
+            handler(self)
             return
 
         # Transiciones basadas en el estado actual
-        state_config = self.config['states'].get(self.current_state, {})
-        transitions = state_config.get('transitions', {})
+        transitions = self._current_transitions
         
         if command in transitions:
             self.set_state(transitions[command])
 
+    def _return_to_previous_menu(self):
+        """Lógica de retorno genérica para los comandos 'esc' y 'reset'."""
+        # Reglas de retorno específicas
+        if self.current_state in RETURN_TO_MAIN_MENU_STATES:
+            self.set_state('MAIN_MENU')
+        else:
+            self.set_state('INIT')
+
+    # Tabla de despacho de los comandos que no dependen de las transiciones del estado
+    _COMMAND_HANDLERS = {
+        'esc': _return_to_previous_menu,
+        'reset': _return_to_previous_menu,
+    }
+
     def set_state(self, new_state):
         """Establece un nuevo estado y notifica al MenuManager."""
-        print(f"Transición de estado: {self.current_state} -> {new_state}")
+        _log.debug("Transición de estado: %s -> %s", self.current_state, new_state)
         self.current_state = new_state
-        new_state_config = self.config['states'].get(new_state)
+        self._last_screen_text = None # El nuevo estado debe analizar la pantalla de nuevo
+        new_state_config = self._states.get(new_state)
+        self._current_config = new_state_config or {}
+        self._current_transitions = self._current_config.get('transitions', {})
         self.menu_manager.update_menu_config(new_state_config)
\ No newline at end of file
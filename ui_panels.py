@@ -10,20 +10,37 @@ class MeasurementPanel:
     """
     Gestiona la lógica y los widgets del panel 'Valores de Medición'.
     """
+    # Clave en parsed_values -> nombre del QLabel que la muestra en la UI
+    LABELS = (
+        ('X', 'valorX'),
+        ('K', 'valorK'),
+        ('U1', 'valorU1'),
+    )
+
     def __init__(self, parent_ui):
         """
         Busca y almacena las referencias a los widgets de este panel.
         
         :param parent_ui: La referencia al widget de la UI cargado (self.ui en MainWindow).
         """
-        self.valorX = parent_ui.findChild(QLabel, 'valorX')
-        self.valorK = parent_ui.findChild(QLabel, 'valorK')
-        self.valorU1 = parent_ui.findChild(QLabel, 'valorU1')
+        # Etiqueta de cada valor, omitiendo las que no existan en el archivo .ui
+        self._labels = {}
+        for key, label_name in self.LABELS:
+            label = parent_ui.findChild(QLabel, label_name)
+            if label is not None:
+                self._labels[key] = label
+        # Último texto mostrado en cada etiqueta
+        self._last_texts = dict.fromkeys(self._labels)
 
     def update_display(self, parsed_values):
         """
         Actualiza los QLabels con los nuevos valores del diccionario.
+
+        Solo se llama a setText en las etiquetas cuyo texto cambió, para no
+        provocar repintados innecesarios.
         """
-        self.valorX.setText(str(parsed_values.get('X', '---')))
-        self.valorK.setText(str(parsed_values.get('K', '---')))
-        self.valorU1.setText(str(parsed_values.get('U1', '---')))
\ No newline at end of file
+        for key, label in self._labels.items():
+            text = str(parsed_values.get(key, '---'))
+            if text != self._last_texts[key]:
+                label.setText(text)
+                self._last_texts[key] = text